@@ -1,5 +1,3 @@
-import argparse
-import json
 import sys
 
 if __name__ == "__main__":
@@ -21,22 +19,28 @@ if __name__ == "__main__":
         print(f"Function '{func_name}' not found.")
         sys.exit(1)
 
-    parser = argparse.ArgumentParser(prog=f"{script_name} {func_name}")
-    parser.add_argument(
-        "--data", type=str, help="Optional JSON object to pass as keyword arguments"
-    )
-
-    args = parser.parse_args(sys.argv[2:])
-
-    if args.data:
-        try:
-            kwargs = json.loads(args.data)
-            if not isinstance(kwargs, dict):
-                raise ValueError("Data must be a JSON object")
-        except Exception as e:
-            print(f"Invalid JSON in --data: {e}")
-            sys.exit(1)
-    else:
-        kwargs = {}
+    kwargs = {}
+
+    # argparse and json are only needed when arguments follow the function
+    # name, so skip importing them for the common no-argument invocation
+    if len(sys.argv) > 2:
+        import argparse
+        import json
+
+        parser = argparse.ArgumentParser(prog=f"{script_name} {func_name}")
+        parser.add_argument(
+            "--data", type=str, help="Optional JSON object to pass as keyword arguments"
+        )
+
+        args = parser.parse_args(sys.argv[2:])
+
+        if args.data:
+            try:
+                kwargs = json.loads(args.data)
+                if not isinstance(kwargs, dict):
+                    raise ValueError("Data must be a JSON object")
+            except Exception as e:
+                print(f"Invalid JSON in --data: {e}")
+                sys.exit(1)
 
     func(**kwargs)
@@ -4,19 +4,23 @@ Python wrapper that executes the Go-based Cerebrium CLI binary.
 Downloads the binary on first run if not present.
 """
 
-import hashlib
-import io
+from __future__ import annotations
+
+import functools
 import os
-import platform
 import re
 import stat
-import subprocess
 import sys
-import tarfile
-import zipfile
-from pathlib import Path
-from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+
+# Same as typing.TYPE_CHECKING, without importing typing at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO
+
+# Modules only needed to download or extract the binary (urllib, tarfile,
+# zipfile, pathlib, ...) are imported inside the functions that use them, so
+# launching an already-installed CLI does not pay for importing them.
 
 # DO NOT EDIT: This version is automatically updated by the GitHub Action
 # (.github/workflows/pypi-publish.yml) during release. It uses GitHub/semver
@@ -49,38 +53,54 @@ __version__ = github_to_pypi_version(VERSION)
 # GitHub repository for releases
 GITHUB_REPO = "CerebriumAI/cerebrium"
 
-# GitHub release URL patterns
-RELEASE_URL_TEMPLATE = (
-    "https://github.com/{repo}/releases/download/"
-    "v{version}/cerebrium_cli_{os}_{arch}.{ext}"
-)
-CHECKSUMS_URL_TEMPLATE = (
-    "https://github.com/{repo}/releases/download/v{version}/checksums.txt"
-)
+# GitHub releases page, shown when a manual install is needed
+RELEASES_URL = f"https://github.com/{GITHUB_REPO}/releases"
+
+# GitHub release asset naming (must match .goreleaser.yaml archives)
+ARCHIVE_NAME_TEMPLATE = "cerebrium_cli_{os}_{arch}.{ext}"
+RELEASE_URL_TEMPLATE = "{releases}/download/v{version}/{archive}"
+CHECKSUMS_URL_TEMPLATE = "{releases}/download/v{version}/checksums.txt"
+
+# Name of the Go binary on this platform
+BINARY_NAME = "cerebrium.exe" if os.name == "nt" else "cerebrium"
 
+# Install locations, resolved once as plain strings since they are checked
+# on every launch
+BIN_DIR = os.path.join(os.path.expanduser("~"), ".cerebrium", "bin")
+BINARY_PATH = os.path.join(BIN_DIR, BINARY_NAME)
+VERSION_FILE = os.path.join(BIN_DIR, ".version")
 
-def get_bin_dir() -> Path:
-    """Get the directory where the binary should be installed."""
-    return Path.home() / ".cerebrium" / "bin"
+# The previously installed binary is kept here on upgrade, so switching back
+# to that version (e.g. a rollback) does not need another download
+PREVIOUS_DIR = os.path.join(BIN_DIR, ".previous")
+PREVIOUS_BINARY_PATH = os.path.join(PREVIOUS_DIR, BINARY_NAME)
+PREVIOUS_VERSION_FILE = os.path.join(PREVIOUS_DIR, ".version")
+
+# Buffer size used when downloading and extracting archives
+COPY_BUFSIZE = 1024 * 1024
 
 
 def get_binary_path() -> Path:
     """Get the path to the cerebrium binary."""
-    binary_name = "cerebrium.exe" if os.name == "nt" else "cerebrium"
-    return get_bin_dir() / binary_name
+    from pathlib import Path
+
+    return Path(BINARY_PATH)
 
 
 def get_version_file() -> Path:
     """Get the path to the version file that tracks installed version."""
-    return get_bin_dir() / ".version"
+    from pathlib import Path
+
+    return Path(VERSION_FILE)
 
 
 def get_installed_version() -> str | None:
     """Get the currently installed version, if any."""
-    version_file = get_version_file()
-    if version_file.exists():
-        return version_file.read_text().strip()
-    return None
+    try:
+        with open(VERSION_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return None
 
 
 def save_installed_version(version: str) -> None:
@@ -90,16 +110,75 @@ def save_installed_version(version: str) -> None:
     version_file.write_text(version)
 
 
+def stash_installed_binary() -> None:
+    """Move the installed binary aside so a later switch back can reuse it."""
+    installed_version = get_installed_version()
+    if installed_version is None or not os.path.exists(BINARY_PATH):
+        return
+
+    os.makedirs(PREVIOUS_DIR, exist_ok=True)
+
+    # Drop the old version marker first so an interrupted stash is never
+    # mistaken for a usable cached binary
+    try:
+        os.remove(PREVIOUS_VERSION_FILE)
+    except FileNotFoundError:
+        pass
+    os.replace(BINARY_PATH, PREVIOUS_BINARY_PATH)
+    with open(PREVIOUS_VERSION_FILE, "w") as f:
+        f.write(installed_version)
+
+    # The main slot is about to be rewritten, so its marker must not keep
+    # describing the binary that just moved out (an interrupted extraction
+    # would otherwise leave a truncated file labelled as a good version)
+    os.remove(VERSION_FILE)
+
+
+def restore_previous_binary(version: str) -> bool:
+    """Swap the previously installed binary back in if it matches version.
+
+    Returns True if the binary was restored, False if a download is needed.
+    """
+    try:
+        with open(PREVIOUS_VERSION_FILE) as f:
+            previous_version = f.read().strip()
+    except OSError:
+        return False
+
+    if previous_version != version or not os.path.exists(PREVIOUS_BINARY_PATH):
+        return False
+
+    restoring_path = BINARY_PATH + ".restoring"
+    os.replace(PREVIOUS_BINARY_PATH, restoring_path)
+    stash_installed_binary()
+    os.replace(restoring_path, BINARY_PATH)
+    save_installed_version(version)
+
+    print(f"  Restored Cerebrium CLI v{version} from {PREVIOUS_DIR}\n")
+    return True
+
+
+@functools.lru_cache(maxsize=None)
 def get_platform_info() -> tuple[str, str, str]:
     """Determine OS and architecture for binary download."""
-    system = platform.system().lower()
-    machine = platform.machine().lower()
+    # Read the same sources platform.machine() uses, without importing the
+    # platform module on every launch
+    system = sys.platform
+    if system == "win32":
+        # PROCESSOR_ARCHITEW6432 holds the OS architecture when a 32-bit
+        # Python runs on 64-bit Windows (e.g. "AMD64" or "ARM64")
+        machine = (
+            os.environ.get("PROCESSOR_ARCHITEW6432")
+            or os.environ.get("PROCESSOR_ARCHITECTURE", "")
+        ).lower()
+    else:
+        machine = os.uname().machine.lower()
 
     # Map Python platform names to GoReleaser naming
     os_map = {
         "darwin": "darwin",
         "linux": "linux",
-        "windows": "windows",
+        "win32": "windows",
     }
 
     arch_map = {
@@ -116,20 +195,20 @@ def get_platform_info() -> tuple[str, str, str]:
         print(
             f"Error: Unsupported platform: {system} {machine}\n"
             f"Please install the binary manually from:\n"
-            f"https://github.com/{GITHUB_REPO}/releases",
+            f"{RELEASES_URL}",
             file=sys.stderr,
         )
         sys.exit(1)
 
-    ext = "zip" if system == "windows" else "tar.gz"
+    ext = "zip" if os_name == "windows" else "tar.gz"
 
     return os_name, arch_name, ext
 
 
-def verify_checksum(data: bytes, expected_checksums: str, archive_name: str) -> None:
-    """Verify the SHA256 checksum of downloaded data."""
-    sha256_hash = hashlib.sha256(data).hexdigest()
-
+def verify_checksum(
+    sha256_hash: str, expected_checksums: str, archive_name: str
+) -> None:
+    """Verify a SHA256 digest against the release checksums file."""
     # Find the expected checksum for this archive
     expected_checksum = None
     for line in expected_checksums.split("\n"):
@@ -156,23 +235,31 @@ def verify_checksum(data: bytes, expected_checksums: str, archive_name: str) ->
     print(f"  Checksum verified: {sha256_hash[:16]}...")
 
 
-def download_with_progress(url: str, desc: str) -> bytes:
-    """Download a URL with a simple progress indicator."""
+def download_with_progress(url: str, desc: str, dst: BinaryIO) -> str:
+    """Download a URL into a file object with a simple progress indicator.
+
+    The SHA256 digest is computed as each chunk arrives, so hashing overlaps
+    the network transfer. Returns the hex digest of the downloaded data.
+    """
+    import hashlib
+    from urllib.error import HTTPError, URLError
+    from urllib.request import urlopen
+
+    sha256 = hashlib.sha256()
     try:
         with urlopen(url, timeout=60) as response:
             total_size = response.headers.get("Content-Length")
             if total_size:
                 total_size = int(total_size)
 
-            data = b""
             downloaded = 0
-            block_size = 8192
 
             while True:
-                chunk = response.read(block_size)
+                chunk = response.read(COPY_BUFSIZE)
                 if not chunk:
                     break
-                data += chunk
+                sha256.update(chunk)
+                dst.write(chunk)
                 downloaded += len(chunk)
 
                 if total_size:
@@ -186,118 +273,174 @@ def download_with_progress(url: str, desc: str) -> bytes:
                     )
 
             print()  # Newline after progress
-            return data
+            return sha256.hexdigest()
     except (HTTPError, URLError) as e:
         raise RuntimeError(f"Failed to download from {url}: {e}")
 
 
+def download_checksums(url: str) -> str:
+    """Download the release checksums file."""
+    from urllib.error import HTTPError, URLError
+    from urllib.request import urlopen
+
+    try:
+        with urlopen(url, timeout=10) as response:
+            return response.read().decode("utf-8")
+    except (HTTPError, URLError) as e:
+        raise RuntimeError(
+            f"Failed to download checksums: {e}\n"
+            f"Please install manually from:\n"
+            f"{RELEASES_URL}"
+        )
+
+
 def download_binary(version: str) -> Path:
     """Download the appropriate binary for this platform."""
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
     os_name, arch_name, ext = get_platform_info()
 
-    archive_name = f"cerebrium_cli_{os_name}_{arch_name}.{ext}"
+    archive_name = ARCHIVE_NAME_TEMPLATE.format(os=os_name, arch=arch_name, ext=ext)
     url = RELEASE_URL_TEMPLATE.format(
-        repo=GITHUB_REPO, version=version, os=os_name, arch=arch_name, ext=ext
+        releases=RELEASES_URL, version=version, archive=archive_name
+    )
+    checksums_url = CHECKSUMS_URL_TEMPLATE.format(
+        releases=RELEASES_URL, version=version
     )
-    checksums_url = CHECKSUMS_URL_TEMPLATE.format(repo=GITHUB_REPO, version=version)
 
     print(f"Downloading Cerebrium CLI v{version} for {os_name}/{arch_name}...")
 
-    # Download checksums first
-    try:
-        with urlopen(checksums_url, timeout=10) as response:
-            checksums_data = response.read().decode("utf-8")
-    except (HTTPError, URLError) as e:
-        raise RuntimeError(
-            f"Failed to download checksums: {e}\n"
-            f"Please install manually from:\n"
-            f"https://github.com/{GITHUB_REPO}/releases"
-        )
+    # Fetch the small checksums file in the background while the archive
+    # downloads, rather than waiting on a separate round trip up front
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        checksums_future = executor.submit(download_checksums, checksums_url)
+
+        # Stream the archive to a temporary file rather than holding it in memory
+        with tempfile.TemporaryFile() as archive:
+            sha256_hash = download_with_progress(url, "Downloading", archive)
+
+            # Verify checksum
+            verify_checksum(sha256_hash, checksums_future.result(), archive_name)
 
-    # Download the binary archive
-    data = download_with_progress(url, "Downloading")
+            # Keep the current binary for a later switch back, then extract
+            stash_installed_binary()
+            archive.seek(0)
+            binary_path = extract_binary(archive, ext)
 
-    # Verify checksum
-    verify_checksum(data, checksums_data, archive_name)
+    # Make executable (Unix only)
+    if os_name != "windows":
+        binary_path.chmod(binary_path.stat().st_mode | stat.S_IEXEC)
+
+    # Save the installed version
+    save_installed_version(version)
+
+    print(f"  Cerebrium CLI v{version} installed successfully!\n")
+    return binary_path
 
-    # Extract the binary
-    bin_dir = get_bin_dir()
-    bin_dir.mkdir(parents=True, exist_ok=True)
 
-    binary_name = "cerebrium.exe" if os_name == "windows" else "cerebrium"
-    binary_path = bin_dir / binary_name
+def extract_binary(archive: BinaryIO, ext: str) -> Path:
+    """Extract the cerebrium binary from a downloaded archive file."""
+    import tarfile
+    import zipfile
+
+    binary_path = get_binary_path()
+    binary_path.parent.mkdir(parents=True, exist_ok=True)
 
     print(f"  Extracting to {binary_path}...")
 
     binary_found = False
 
     if ext == "zip":
-        with zipfile.ZipFile(io.BytesIO(data)) as zf:
-            for member in zf.namelist():
-                if member.endswith(binary_name) or member == binary_name:
-                    with zf.open(member) as src, open(binary_path, "wb") as dst:
-                        dst.write(src.read())
-                        binary_found = True
-                        break
+        with zipfile.ZipFile(archive) as zf:
+            for member in zf.infolist():
+                if member.filename.endswith(BINARY_NAME):
+                    with zf.open(member) as src:
+                        write_binary(src, binary_path)
+                    binary_found = True
+                    break
     else:
-        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tf:
-            for member in tf.getmembers():
-                if member.name.endswith(binary_name) or member.name == binary_name:
+        # Stream mode reads members sequentially without building the full index
+        with tarfile.open(fileobj=archive, mode="r|gz", bufsize=COPY_BUFSIZE) as tf:
+            for member in tf:
+                if member.name.endswith(BINARY_NAME):
                     src = tf.extractfile(member)
                     if src is None:
                         continue
-                    with src, open(binary_path, "wb") as dst:
-                        dst.write(src.read())
-                        binary_found = True
-                        break
+                    with src:
+                        write_binary(src, binary_path)
+                    binary_found = True
+                    break
 
     if not binary_found or not binary_path.exists():
         raise RuntimeError(
-            f"Failed to extract binary '{binary_name}' from archive.\n"
+            f"Failed to extract binary '{BINARY_NAME}' from archive.\n"
             f"Please install manually from:\n"
-            f"https://github.com/{GITHUB_REPO}/releases"
+            f"{RELEASES_URL}"
         )
 
-    # Make executable (Unix only)
-    if os_name != "windows":
-        binary_path.chmod(binary_path.stat().st_mode | stat.S_IEXEC)
+    return binary_path
 
-    # Save the installed version
-    save_installed_version(version)
 
-    print(f"  Cerebrium CLI v{version} installed successfully!\n")
-    return binary_path
+def write_binary(src: BinaryIO, binary_path: Path) -> None:
+    """Copy an archive member to the binary path with a bounded buffer."""
+    import shutil
 
+    with open(binary_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFSIZE)
 
-def ensure_binary() -> Path:
+
+def ensure_binary() -> str:
     """Ensure the binary is installed, downloading if necessary."""
-    binary_path = get_binary_path()
     installed_version = get_installed_version()
+    binary_exists = os.path.exists(BINARY_PATH)
 
     # Check if we need to download/update
-    if binary_path.exists() and installed_version == VERSION:
-        return binary_path
+    if binary_exists and installed_version == VERSION:
+        return BINARY_PATH
 
     # Binary missing or version mismatch
-    if not binary_path.exists():
+    if not binary_exists:
         print("Cerebrium CLI binary not found. Installing...\n")
     elif installed_version != VERSION:
         print(f"Updating Cerebrium CLI from v{installed_version} to v{VERSION}...\n")
 
     try:
-        return download_binary(VERSION)
+        if restore_previous_binary(VERSION):
+            return BINARY_PATH
+        return str(download_binary(VERSION))
     except RuntimeError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    except OSError as e:
+        print(
+            f"Error: Failed to install Cerebrium CLI to {BIN_DIR}: {e}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
 
 
 def main():
     """Execute the Go binary with the provided arguments."""
     binary = ensure_binary()
+    argv = [binary] + sys.argv[1:]
+
+    # On POSIX, replace this process with the Go binary so the interpreter
+    # does not stay resident (and signals reach the CLI directly)
+    if os.name != "nt":
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            os.execv(argv[0], argv)
+        except OSError as e:
+            print(f"Error executing Cerebrium CLI: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    # Windows has no true exec, so run the binary as a child process
+    import subprocess
 
-    # Pass through all arguments to the Go binary
     try:
-        result = subprocess.run([str(binary)] + sys.argv[1:])
+        result = subprocess.run(argv)
         sys.exit(result.returncode)
     except KeyboardInterrupt:
         sys.exit(130)